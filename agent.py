@@ -3,7 +3,9 @@ Gemini-powered autonomous agent for scam conversations
 """
 
 from google import genai
-from config import GEMINI_API_KEY
+from config import GEMINI_API_KEY, GEMINI_MAX_CONCURRENCY, AGENT_TEMPERATURE, AGENT_MAX_TOKENS
+from reply_cache import make_key, get_cached_reply, cache_reply
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,6 +22,9 @@ if GEMINI_API_KEY:
 else:
     logger.warning("⚠️ No GEMINI_API_KEY provided, using fallback responses")
 
+# Caps concurrent Gemini requests so bursts of sessions stay within quota
+_gemini_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
 
 SYSTEM_PROMPT = """You are a normal human user talking to someone who contacted you.
 You must never reveal that you're an AI or that this is a scam detection system.
@@ -44,6 +49,15 @@ Always:
 - Show willingness to cooperate while being uncertain
 """
 
+# Request config is identical for every call, build it once
+GENERATION_CONFIG = {
+    "system_instruction": SYSTEM_PROMPT.strip(),
+    "temperature": AGENT_TEMPERATURE,  # More natural variation
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": AGENT_MAX_TOKENS,
+}
+
 
 FALLBACK_RESPONSES = [
     "I'm not sure I understand. Can you explain what exactly I need to do?",
@@ -57,13 +71,43 @@ FALLBACK_RESPONSES = [
 ]
 
 
-def generate_agent_reply(latest_message: str, history: list) -> str:
+def _build_contents(latest_message: str, history: list) -> list:
+    """
+    Convert the conversation into Gemini chat turns
+
+    The system prompt is sent separately as system_instruction, so the
+    request starts with the same static prefix every time and Gemini's
+    implicit prompt caching can reuse it.
+
+    Args:
+        latest_message: The most recent message from the scammer
+        history: List of previous Message objects in the conversation
+
+    Returns:
+        List of Gemini content dicts (scammer -> user, us -> model)
     """
-    Generate a contextual reply using Gemini AI
+    contents = []
+    turns = [(msg.sender, msg.text) for msg in history[-10:]]
+    turns.append(("scammer", latest_message))
+
+    for sender, text in turns:
+        role = "user" if sender == "scammer" else "model"
+        # Merge consecutive messages from the same side into one turn
+        if contents and contents[-1]["role"] == role:
+            contents[-1]["parts"].append({"text": text})
+        else:
+            contents.append({"role": role, "parts": [{"text": text}]})
+
+    return contents
+
+
+async def generate_agent_reply(latest_message: str, history: list) -> str:
+    """
+    Generate a contextual reply using Gemini AI (non-blocking)
     
     Args:
         latest_message: The most recent message from the scammer
-        history: List of previous messages in the conversation
+        history: List of previous Message objects in the conversation
     
     Returns:
         Agent's reply as a string
@@ -76,32 +120,25 @@ def generate_agent_reply(latest_message: str, history: list) -> str:
         logger.warning("Using fallback response (no Gemini client)")
         return fallback_reply
 
+    # Templated scam messages often repeat, reuse an earlier reply if we have one
+    cache_key = make_key(latest_message, history)
+    cached_reply = get_cached_reply(cache_key)
+    if cached_reply:
+        return cached_reply
+
     try:
-        # Build conversation context
-        conversation = SYSTEM_PROMPT.strip() + "\n\nConversation history:\n"
-
-        # Add conversation history
-        for msg in history[-10:]:  # Limit to last 10 messages for context
-            sender = msg.get('sender', 'unknown')
-            text = msg.get('text', '')
-            conversation += f"{sender}: {text}\n"
-
-        # Add latest message
-        conversation += f"\nscammer: {latest_message}\n\nYour response as the user:"
-
-        logger.info(f"Generating reply with Gemini (context length: {len(conversation)} chars)")
-
-        # Generate response
-        response = client.models.generate_content(
-            model="gemini-1.5-flash",
-            contents=conversation,
-            config={
-                "temperature": 0.9,  # More natural variation
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 150,
-            }
-        )
+        # Build conversation turns (last 10 messages plus the latest one)
+        contents = _build_contents(latest_message, history)
+
+        logger.info(f"Generating reply with Gemini ({len(contents)} turns)")
+
+        # Generate response without blocking the event loop
+        async with _gemini_slots:
+            response = await client.aio.models.generate_content(
+                model="gemini-1.5-flash",
+                contents=contents,
+                config=GENERATION_CONFIG
+            )
 
         # Extract text safely
         if response and hasattr(response, "text"):
@@ -110,6 +147,7 @@ def generate_agent_reply(latest_message: str, history: list) -> str:
             # Validate reply isn't too long or empty
             if reply and len(reply) > 10 and len(reply) < 500:
                 logger.info(f"✅ Generated reply: {reply[:50]}...")
+                cache_reply(cache_key, reply)
                 return reply
             else:
                 logger.warning("Generated reply invalid, using fallback")
@@ -128,7 +166,7 @@ def test_agent():
     test_message = "Your account has been blocked! Click this link urgently to verify."
     test_history = []
     
-    reply = generate_agent_reply(test_message, test_history)
+    reply = asyncio.run(generate_agent_reply(test_message, test_history))
     print(f"Test Reply: {reply}")
 
 
@@ -4,11 +4,39 @@ Callback handler for sending final results to GUVI
 
 import requests
 import logging
+import random
+import time
 from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import GUVI_CALLBACK_URL
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so callbacks reuse pooled keep-alive connections
+# instead of paying a TCP + TLS handshake on every attempt
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=0)  # retries are handled in send_final_callback
+)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+_session.headers.update({
+    'Content-Type': 'application/json',
+    'User-Agent': 'AI-Agentic-Honeypot/2.0'
+})
+
+# Retry backoff settings (seconds)
+BACKOFF_MAX_DELAY = 30
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter for the given zero-based attempt"""
+    return min(BACKOFF_MAX_DELAY, 2 ** attempt) + random.uniform(0, 1)
+
 
 def send_final_callback(payload: dict, max_retries: int = 3) -> bool:
     """
@@ -16,7 +44,8 @@ def send_final_callback(payload: dict, max_retries: int = 3) -> bool:
     
     Args:
         payload: Dictionary containing scam detection results
-        max_retries: Maximum number of retry attempts
+        max_retries: Maximum number of attempts; only timeouts, connection
+            errors, 429 and 5xx responses are retried, with backoff
     
     Returns:
         Boolean indicating success
@@ -29,15 +58,14 @@ def send_final_callback(payload: dict, max_retries: int = 3) -> bool:
     logger.info(f"Payload: {payload}")
     
     for attempt in range(max_retries):
+        if attempt > 0:
+            time.sleep(_backoff_delay(attempt - 1))
+        
         try:
-            response = requests.post(
+            response = _session.post(
                 GUVI_CALLBACK_URL,
                 json=payload,
-                timeout=10,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'AI-Agentic-Honeypot/2.0'
-                }
+                timeout=(3, 10)  # (connect, read)
             )
             
             # Check response status
@@ -45,11 +73,14 @@ def send_final_callback(payload: dict, max_retries: int = 3) -> bool:
                 logger.info(f"✅ Callback successful (attempt {attempt + 1}/{max_retries})")
                 logger.info(f"Response: {response.text}")
                 return True
-            else:
-                logger.warning(
-                    f"⚠️ Callback failed with status {response.status_code} "
-                    f"(attempt {attempt + 1}/{max_retries}): {response.text}"
-                )
+            
+            logger.warning(
+                f"⚠️ Callback failed with status {response.status_code} "
+                f"(attempt {attempt + 1}/{max_retries}): {response.text}"
+            )
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                logger.error("❌ Callback rejected, not retrying")
+                return False
         
         except requests.exceptions.Timeout:
             logger.warning(f"⏱️ Callback timeout (attempt {attempt + 1}/{max_retries})")
@@ -61,6 +92,7 @@ def send_final_callback(payload: dict, max_retries: int = 3) -> bool:
             logger.error(
                 f"❌ Callback error (attempt {attempt + 1}/{max_retries}): {str(e)}"
             )
+            return False
     
     logger.error(f"❌ All callback attempts failed after {max_retries} retries")
     return False
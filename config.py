@@ -22,6 +22,14 @@ GUVI_CALLBACK_URL = os.getenv(
 
 # Redis Configuration
 REDIS_URL = os.getenv("REDIS_URL", "")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "64"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "1.0"))  # seconds to wait for a free connection
+REDIS_WARM_CONNECTIONS = int(os.getenv("REDIS_WARM_CONNECTIONS", "8"))  # opened at startup
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL", "5"))  # seconds between background PINGs
+# Read sessions saved under bare IDs (before the {session}: key prefix) and
+# move them over. Set to 0 once SESSION_TTL has passed since upgrading;
+# by then no such keys are left and this fallback can be removed.
+LEGACY_KEY_MIGRATION = os.getenv("LEGACY_KEY_MIGRATION", "1") == "1"
 
 # Application Settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -30,10 +38,15 @@ MIN_MESSAGES_FOR_CALLBACK = int(os.getenv("MIN_MESSAGES_FOR_CALLBACK", "8"))
 
 # Session Configuration
 SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))  # 24 hours in seconds
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "0"))  # local read cache, 0 disables; only for single-worker deployments
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_MISS_CACHE_TTL = int(os.getenv("SESSION_MISS_CACHE_TTL", "5"))  # remember unknown session IDs, 0 disables
 
 # Agent Configuration
 AGENT_TEMPERATURE = float(os.getenv("AGENT_TEMPERATURE", "0.9"))
 AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "150"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))  # in-flight calls per worker
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "1024"))  # 0 disables the reply cache
 
 
 def validate_config() -> dict:
@@ -68,6 +81,8 @@ def validate_config() -> dict:
             "log_level": LOG_LEVEL,
             "scam_threshold": SCAM_DETECTION_THRESHOLD,
             "min_messages_for_callback": MIN_MESSAGES_FOR_CALLBACK,
+            "gemini_max_concurrency": GEMINI_MAX_CONCURRENCY,
+            "reply_cache_size": REPLY_CACHE_SIZE,
         }
     }
 
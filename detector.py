@@ -3,6 +3,12 @@ Scam detection engine with keyword-based scoring
 """
 
 import logging
+from typing import Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional, fall back to plain substring checks
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
@@ -85,46 +91,107 @@ SCAM_SIGNALS = {
 THRESHOLD = 4
 
 
-def detect_scam_score(text: str) -> int:
+def _build_automaton():
+    """Build a single Aho-Corasick automaton over all SCAM_SIGNALS keywords"""
+    if ahocorasick is None:
+        logger.warning("⚠️ pyahocorasick not installed, using per-keyword scan")
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword, weight in SCAM_SIGNALS.items():
+        automaton.add_word(keyword, (keyword, weight))
+    automaton.make_automaton()
+    return automaton
+
+
+# Built once at import, scans a message in one pass
+_AUTOMATON = _build_automaton()
+
+# Fallback prefilter: the character bigrams each keyword needs, so keywords
+# that cannot occur in a message are rejected without a substring search
+_SIGNAL_BIGRAMS = [
+    (keyword, weight, frozenset(keyword[i:i + 2] for i in range(len(keyword) - 1)))
+    for keyword, weight in SCAM_SIGNALS.items()
+]
+
+
+def _match_signals(text_lower: str) -> dict:
     """
-    Calculate scam score based on keyword matches
+    Find every SCAM_SIGNALS keyword occurring in the lowercased text
+
+    Args:
+        text_lower: Lowercased message text
+
+    Returns:
+        Dictionary of matched keyword -> weight (each keyword counted once)
+    """
+    if _AUTOMATON is None:
+        present = {text_lower[i:i + 2] for i in range(len(text_lower) - 1)}
+        return {
+            keyword: weight
+            for keyword, weight, bigrams in _SIGNAL_BIGRAMS
+            if bigrams <= present and keyword in text_lower
+        }
+
+    matched = {}
+    for _, (keyword, weight) in _AUTOMATON.iter(text_lower):
+        matched[keyword] = weight
+    return matched
+
+
+def _scan(text: str, text_lower: Optional[str] = None) -> Tuple[int, dict]:
+    """
+    Score a message and collect its matched signals in a single pass
     
     Args:
         text: Message text to analyze
+        text_lower: Precomputed text.lower(), if the caller already has it
     
     Returns:
-        Integer scam score
+        Tuple of (scam score, matched keyword -> weight)
     """
     if not text:
-        return 0
+        return 0, {}
     
-    text_lower = text.lower()
-    score = 0
-    matched_keywords = []
+    if text_lower is None:
+        text_lower = text.lower()
     
-    # Check for each scam signal
-    for keyword, weight in SCAM_SIGNALS.items():
-        if keyword in text_lower:
-            score += weight
-            matched_keywords.append(keyword)
+    matched = _match_signals(text_lower)
+    score = sum(matched.values())
     
-    if matched_keywords:
-        logger.info(f"Scam signals detected: {matched_keywords} (score: {score})")
+    if matched:
+        logger.info(f"Scam signals detected: {list(matched)} (score: {score})")
     
+    return score, matched
+
+
+def detect_scam_score(text: str, text_lower: Optional[str] = None) -> int:
+    """
+    Calculate scam score based on keyword matches
+    
+    Args:
+        text: Message text to analyze
+        text_lower: Precomputed text.lower(), if the caller already has it
+    
+    Returns:
+        Integer scam score
+    """
+    score, _ = _scan(text, text_lower)
     return score
 
 
-def is_scam(text: str) -> bool:
+def is_scam(text: str, text_lower: Optional[str] = None) -> bool:
     """
     Determine if text is likely a scam
     
     Args:
         text: Message text to analyze
+        text_lower: Precomputed text.lower(), if the caller already has it
     
     Returns:
         Boolean indicating if text exceeds scam threshold
     """
-    score = detect_scam_score(text)
+    score = detect_scam_score(text, text_lower)
     return score >= THRESHOLD
 
 
@@ -138,19 +205,16 @@ def analyze_message(text: str) -> dict:
     Returns:
         Dictionary with analysis results
     """
-    score = detect_scam_score(text)
-    is_scam_flag = is_scam(text)
+    score, matched = _scan(text)
     
-    text_lower = text.lower()
     matched_signals = [
         {"keyword": k, "weight": w}
-        for k, w in SCAM_SIGNALS.items()
-        if k in text_lower
+        for k, w in matched.items()
     ]
     
     return {
         "scamScore": score,
-        "isScam": is_scam_flag,
+        "isScam": score >= THRESHOLD,
         "threshold": THRESHOLD,
         "matchedSignals": matched_signals,
         "riskLevel": "high" if score >= 8 else "medium" if score >= 4 else "low"
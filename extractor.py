@@ -5,16 +5,75 @@ Extracts bank accounts, UPI IDs, phone numbers, URLs, and emails
 
 import re
 import logging
+from typing import Optional
+
+try:
+    import re2
+except ImportError:  # google-re2 is optional, stdlib re is used instead
+    re2 = None
 
 logger = logging.getLogger(__name__)
 
 
-def extract_intelligence(text: str) -> dict:
+def _compile(pattern: str):
+    """
+    Compile a pattern with RE2 (linear-time DFA) when available
+
+    Args:
+        pattern: Regular expression source
+
+    Returns:
+        Compiled pattern, falling back to stdlib re if RE2 is missing
+        or does not support the syntax
+    """
+    if re2 is not None:
+        try:
+            return re2.compile(pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern)
+
+
+# Patterns are compiled once at import instead of on every message
+_BANK_RE = _compile(r'\b\d{12,16}\b')  # 12-16 digit account numbers
+_URL_RE = _compile(r'https?://\S+')
+_EMAIL_RE = _compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Phone numbers (Indian format) in one pass, longest form first so a
+# prefixed number is not matched again as a bare 10-digit number.
+# Each alternative captures the 10-digit core. Uses lookbehind, which RE2
+# does not support, so it is compiled with stdlib re directly.
+_PHONE_RE = re.compile(
+    r'\+91[-\s]?(\d{10})'           # +91 with optional separator
+    r'|(?<!\w)91(\d{10})(?!\w)'      # 91 followed by 10 digits
+    r'|(?<![\w+])([6-9]\d{9})(?!\w)'  # 10 digit starting with 6-9
+)
+
+# Common UPI handles used to filter generic user@host matches
+UPI_HANDLES = ('@upi', '@paytm', '@ybl', '@oksbi', '@okaxis', '@okicici', '@okhdfcbank')
+
+# UPI IDs on a known handle (case-insensitive), so the regex engine does
+# the filtering in the same pass instead of a Python loop over matches
+_UPI_RE = _compile(
+    r'[a-zA-Z0-9._-]+@(?i:'
+    + '|'.join(handle[1:] for handle in UPI_HANDLES)
+    + r')[a-zA-Z0-9]*'
+)
+
+SUSPICIOUS_KEYWORDS = (
+    "urgent", "urgently", "verify", "blocked", "suspended",
+    "click", "otp", "password", "pin", "cvv", "account number",
+    "card number", "immediately", "expire", "frozen", "locked"
+)
+
+
+def extract_intelligence(text: str, text_lower: Optional[str] = None) -> dict:
     """
     Extract various types of intelligence from text
     
     Args:
         text: Message text to analyze
+        text_lower: Precomputed text.lower(), if the caller already has it
     
     Returns:
         Dictionary containing extracted intelligence
@@ -30,45 +89,27 @@ def extract_intelligence(text: str) -> dict:
         }
     
     # Extract bank account numbers (12-16 digits)
-    bank_accounts = list(set(re.findall(r'\b\d{12,16}\b', text)))
+    bank_accounts = list(dict.fromkeys(_BANK_RE.findall(text)))
     
-    # Extract UPI IDs
-    upi_ids = list(set(re.findall(r'[a-zA-Z0-9._-]+@[a-zA-Z0-9]+', text)))
-    # Filter to common UPI handles
-    upi_ids = [uid for uid in upi_ids if any(handle in uid.lower() for handle in 
-               ['@upi', '@paytm', '@ybl', '@oksbi', '@okaxis', '@okicici', '@okhdfcbank'])]
+    # Extract UPI IDs on common handles, deduplicated in order of appearance
+    upi_ids = list(dict.fromkeys(_UPI_RE.findall(text)))
     
     # Extract URLs
-    urls = list(set(re.findall(r'https?://\S+', text)))
+    urls = list(dict.fromkeys(_URL_RE.findall(text)))
     
     # Extract phone numbers (Indian format)
-    phone_patterns = [
-        r'\+91[-\s]?\d{10}',  # +91 with optional separator
-        r'\b91\d{10}\b',       # 91 followed by 10 digits
-        r'\b[6-9]\d{9}\b'      # 10 digit starting with 6-9
-    ]
-    phone_numbers = []
-    for pattern in phone_patterns:
-        phone_numbers.extend(re.findall(pattern, text))
-    phone_numbers = list(set(phone_numbers))
+    phone_numbers = list(dict.fromkeys(
+        next(group for group in match.groups() if group)
+        for match in _PHONE_RE.finditer(text)
+    ))
     
     # Extract email addresses
-    email_addresses = list(set(re.findall(
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        text
-    )))
+    email_addresses = list(dict.fromkeys(_EMAIL_RE.findall(text)))
     
     # Extract suspicious keywords
-    suspicious_keywords_list = [
-        "urgent", "urgently", "verify", "blocked", "suspended",
-        "click", "otp", "password", "pin", "cvv", "account number",
-        "card number", "immediately", "expire", "frozen", "locked"
-    ]
-    
-    text_lower = text.lower()
-    found_keywords = list(set([
-        kw for kw in suspicious_keywords_list if kw in text_lower
-    ]))
+    if text_lower is None:
+        text_lower = text.lower()
+    found_keywords = [kw for kw in SUSPICIOUS_KEYWORDS if kw in text_lower]
     
     intelligence = {
         "bankAccounts": bank_accounts,
@@ -3,20 +3,21 @@ AI Agentic Honeypot - Main API Server
 A sophisticated scam detection system using Gemini AI
 """
 
-from fastapi import FastAPI, Header, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import logging
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
 from config import API_KEY
 from models import ChatRequest, ChatResponse, HealthResponse
-from detector import is_scam, detect_scam_score
+from detector import detect_scam_score, THRESHOLD
 from extractor import extract_intelligence
 from agent import generate_agent_reply
 from callback import send_final_callback
-from redis_store import get_session, save_session
-from memory import sessions
+from redis_store import init_redis, close_redis, get_session, save_session
+from memory import Session, serialize_intel, sessions, touch_session
 
 # Configure logging
 logging.basicConfig(
@@ -25,17 +26,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Verify external connections and warm caches on startup, close them on shutdown"""
+    await init_redis()
+    # Generate (and cache) the OpenAPI schema now rather than on the first /docs hit
+    app.openapi()
+    yield
+    await close_redis()
+
+
 app = FastAPI(
     title="AI Agentic Honeypot",
     description="Intelligent scam detection and intelligence gathering system",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
-    allow_credentials=True,
+    allow_credentials=False,  # auth is the x-api-key header, no cookies needed
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -48,7 +62,7 @@ def root():
         "status": "healthy",
         "service": "AI Agentic Honeypot",
         "version": "2.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
 
@@ -59,17 +73,22 @@ def health_check():
         "status": "healthy",
         "service": "AI Agentic Honeypot",
         "version": "2.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(body: ChatRequest, x_api_key: str = Header(None)):
+async def chat(
+    body: ChatRequest,
+    background_tasks: BackgroundTasks,
+    x_api_key: str = Header(None)
+):
     """
     Main chat endpoint for processing messages and detecting scams
     
     Args:
         body: ChatRequest containing message and session information
+        background_tasks: Runs the final GUVI callback after the response is sent
         x_api_key: API key for authentication
     
     Returns:
@@ -81,96 +100,84 @@ def chat(body: ChatRequest, x_api_key: str = Header(None)):
         raise HTTPException(status_code=401, detail="Invalid API Key")
 
     try:
-        body_dict = body.model_dump()
-
-        # Extract message safely
-        message = body_dict.get("message", {})
-        text = message.get("text", "").strip()
+        # Read typed fields directly, no full model_dump() per request
+        text = body.message.text.strip()
 
         if not text:
             raise HTTPException(status_code=400, detail="Message text is required")
 
-        session_id = body_dict.get("sessionId")
+        session_id = body.sessionId
+        now_iso = datetime.now(timezone.utc).isoformat()
         logger.info(f"Processing message for session {session_id}: {text[:50]}...")
 
         # Get or create session
-        session = get_session(session_id) or sessions.get(session_id)
+        stored = await get_session(session_id)
+        session = Session.from_dict(stored) if stored else sessions.get(session_id)
 
         if not session:
             logger.info(f"Creating new session: {session_id}")
-            session = {
-                "sessionId": session_id,
-                "messages": [],
-                "scamDetected": False,
-                "scamScore": 0,
-                "intel": {
-                    "bankAccounts": [],
-                    "upiIds": [],
-                    "phishingLinks": [],
-                    "phoneNumbers": [],
-                    "suspiciousKeywords": [],
-                    "emailAddresses": []
-                },
-                "callbackSent": False,
-                "createdAt": datetime.utcnow().isoformat(),
-                "lastUpdated": datetime.utcnow().isoformat()
-            }
+            session = Session(sessionId=session_id, createdAt=now_iso, lastUpdated=now_iso)
 
         # Store message
-        session["messages"].append(message)
-        session["lastUpdated"] = datetime.utcnow().isoformat()
+        session.messages.append(body.message.model_dump())
+        session.lastUpdated = now_iso
+
+        # Lowercase once, shared by the detector and extractor
+        text_lower = text.lower()
 
         # Scam detection
-        score = detect_scam_score(text)
-        session["scamScore"] += score
+        score = detect_scam_score(text, text_lower)
+        session.scamScore += score
         
-        logger.info(f"Session {session_id}: score={score}, total={session['scamScore']}")
+        logger.info(f"Session {session_id}: score={score}, total={session.scamScore}")
 
-        if is_scam(text) and not session["scamDetected"]:
-            session["scamDetected"] = True
+        if score >= THRESHOLD and not session.scamDetected:
+            session.scamDetected = True
             logger.warning(f"🚨 SCAM DETECTED in session {session_id}")
 
         # Intelligence extraction
-        intel = extract_intelligence(text)
+        intel = extract_intelligence(text, text_lower)
         for key in intel:
-            if key in session["intel"]:
-                session["intel"][key] = list(set(session["intel"][key] + intel[key]))
+            if key in session.intel:
+                session.intel[key].update(intel[key])
 
         # Generate agent response
-        reply = generate_agent_reply(
+        reply = await generate_agent_reply(
             text,
-            body_dict.get("conversationHistory", [])
+            body.conversationHistory
         )
 
         # Final callback logic
-        message_count = len(session["messages"])
+        message_count = len(session.messages)
         if (
-            session["scamDetected"]
+            session.scamDetected
             and message_count >= 8
-            and not session["callbackSent"]
+            and not session.callbackSent
         ):
             payload = {
                 "sessionId": session_id,
                 "scamDetected": True,
                 "totalMessagesExchanged": message_count,
-                "extractedIntelligence": session["intel"],
+                "extractedIntelligence": serialize_intel(session.intel),
                 "agentNotes": "Multi-turn urgency-based financial scam detected",
-                "finalScamScore": session["scamScore"],
-                "timestamp": datetime.utcnow().isoformat()
+                "finalScamScore": session.scamScore,
+                "timestamp": now_iso
             }
-            send_final_callback(payload)
-            session["callbackSent"] = True
-            logger.info(f"✅ Final callback sent for session {session_id}")
+            # Mark as sent before dispatch so a concurrent turn can't fire it twice
+            session.callbackSent = True
+            background_tasks.add_task(send_final_callback, payload)
+            logger.info(f"✅ Final callback queued for session {session_id}")
 
         # Save session
-        save_session(session_id, session)
+        await save_session(session_id, session.to_dict())
         sessions[session_id] = session
+        touch_session(session_id)
 
         return {
             "status": "success",
             "reply": reply,
-            "scamDetected": session["scamDetected"],
-            "scamScore": session["scamScore"],
+            "scamDetected": session.scamDetected,
+            "scamScore": session.scamScore,
             "messageCount": message_count
         }
 
@@ -182,7 +189,7 @@ def chat(body: ChatRequest, x_api_key: str = Header(None)):
 
 
 @app.get("/session/{session_id}")
-def get_session_info(session_id: str, x_api_key: str = Header(None)):
+async def get_session_info(session_id: str, x_api_key: str = Header(None)):
     """
     Retrieve session information
     
@@ -196,7 +203,9 @@ def get_session_info(session_id: str, x_api_key: str = Header(None)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API Key")
 
-    session = get_session(session_id) or sessions.get(session_id)
+    session = await get_session(session_id)
+    if not session and session_id in sessions:
+        session = sessions[session_id].to_dict()
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -211,7 +220,7 @@ def get_session_info(session_id: str, x_api_key: str = Header(None)):
 async def global_exception_handler(request, exc):
     """Global exception handler"""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "An unexpected error occurred"}
     )
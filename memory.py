@@ -3,41 +3,139 @@ In-memory session storage (fallback when Redis is unavailable)
 """
 
 import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Dict
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# Intelligence categories tracked per session
+INTEL_FIELDS = (
+    "bankAccounts",
+    "upiIds",
+    "phishingLinks",
+    "phoneNumbers",
+    "suspiciousKeywords",
+    "emailAddresses",
+)
+
+
+def _empty_intel() -> Dict[str, set]:
+    """Fresh intel store with an empty set per category"""
+    return {key: set() for key in INTEL_FIELDS}
+
+
+def serialize_intel(intel: dict) -> dict:
+    """
+    Convert session intel sets to sorted lists for JSON output
+    
+    Args:
+        intel: Intel field name -> set (or list) of values
+    
+    Returns:
+        Dictionary with deterministic, sorted lists
+    """
+    return {key: sorted(values) for key, values in intel.items()}
+
+
+@dataclass(slots=True)
+class Session:
+    """Conversation state kept between /chat calls (field names match the stored JSON)"""
+    sessionId: str
+    messages: list = field(default_factory=list)
+    scamDetected: bool = False
+    scamScore: int = 0
+    intel: Dict[str, set] = field(default_factory=_empty_intel)
+    callbackSent: bool = False
+    createdAt: str = ""
+    lastUpdated: str = ""
+
+    def to_dict(self) -> dict:
+        """
+        Convert to a plain dict for storage and API responses
+        
+        Returns:
+            Session dictionary with intel as sorted lists
+        """
+        return {
+            "sessionId": self.sessionId,
+            "messages": self.messages,
+            "scamDetected": self.scamDetected,
+            "scamScore": self.scamScore,
+            "intel": serialize_intel(self.intel),
+            "callbackSent": self.callbackSent,
+            "createdAt": self.createdAt,
+            "lastUpdated": self.lastUpdated,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        """
+        Rebuild a session from its stored dict form
+        
+        Args:
+            data: Session dictionary as produced by to_dict
+        
+        Returns:
+            Session instance
+        """
+        intel = _empty_intel()
+        for key, values in data.get("intel", {}).items():
+            intel[key] = set(values)
+        
+        return cls(
+            sessionId=data["sessionId"],
+            messages=list(data.get("messages", [])),
+            scamDetected=data.get("scamDetected", False),
+            scamScore=data.get("scamScore", 0),
+            intel=intel,
+            callbackSent=data.get("callbackSent", False),
+            createdAt=data.get("createdAt", ""),
+            lastUpdated=data.get("lastUpdated", ""),
+        )
+
+
 # Global in-memory session store
-sessions: Dict[str, dict] = {}
+sessions: Dict[str, Session] = {}
+
+# Last update time (epoch seconds) per session, least recently updated
+# first, so cleanup only visits the oldest entries. Holds one entry per
+# session no matter how often it is touched.
+_last_updated: "OrderedDict[str, float]" = OrderedDict()
+
+
+def touch_session(session_id: str):
+    """
+    Record that a session was just updated
+    
+    Args:
+        session_id: Session identifier
+    """
+    _last_updated[session_id] = time.time()
+    _last_updated.move_to_end(session_id)
 
 
 def cleanup_old_sessions(max_age_seconds: int = 86400):
     """
-    Clean up sessions older than max_age_seconds
+    Clean up sessions not touched in the last max_age_seconds
     
     Args:
         max_age_seconds: Maximum age in seconds (default: 24 hours)
     """
-    if not sessions:
-        return
-    
-    current_time = datetime.utcnow().timestamp()
+    cutoff = time.time() - max_age_seconds
     to_delete = []
     
-    for session_id, session_data in sessions.items():
-        # Check if session has lastUpdated timestamp
-        if "lastUpdated" in session_data:
-            try:
-                last_updated = datetime.fromisoformat(session_data["lastUpdated"]).timestamp()
-                if current_time - last_updated > max_age_seconds:
-                    to_delete.append(session_id)
-            except:
-                pass
+    for session_id, updated_at in _last_updated.items():
+        if updated_at > cutoff:
+            break
+        to_delete.append(session_id)
     
     # Delete old sessions
     for session_id in to_delete:
-        del sessions[session_id]
+        del _last_updated[session_id]
+        sessions.pop(session_id, None)
         logger.info(f"🗑️ Cleaned up old session: {session_id}")
     
     if to_delete:
@@ -61,8 +159,8 @@ def get_session_stats() -> dict:
     Returns:
         Dictionary with session statistics
     """
-    total_messages = sum(len(s.get("messages", [])) for s in sessions.values())
-    scam_detected_count = sum(1 for s in sessions.values() if s.get("scamDetected", False))
+    total_messages = sum(len(s.messages) for s in sessions.values())
+    scam_detected_count = sum(1 for s in sessions.values() if s.scamDetected)
     
     return {
         "total_sessions": len(sessions),
@@ -79,19 +177,21 @@ if __name__ == "__main__":
     print("\n=== Memory Storage Tests ===\n")
     
     # Add test sessions
-    sessions["test-1"] = {
-        "sessionId": "test-1",
-        "messages": [{"sender": "user", "text": "test"}],
-        "scamDetected": True,
-        "lastUpdated": datetime.utcnow().isoformat()
-    }
+    sessions["test-1"] = Session(
+        sessionId="test-1",
+        messages=[{"sender": "user", "text": "test"}],
+        scamDetected=True,
+        lastUpdated=datetime.now(timezone.utc).isoformat()
+    )
+    touch_session("test-1")
     
-    sessions["test-2"] = {
-        "sessionId": "test-2",
-        "messages": [{"sender": "user", "text": "hello"}],
-        "scamDetected": False,
-        "lastUpdated": datetime.utcnow().isoformat()
-    }
+    sessions["test-2"] = Session(
+        sessionId="test-2",
+        messages=[{"sender": "user", "text": "hello"}],
+        scamDetected=False,
+        lastUpdated=datetime.now(timezone.utc).isoformat()
+    )
+    touch_session("test-2")
     
     stats = get_session_stats()
     print(f"Session stats: {stats}")
@@ -2,32 +2,45 @@
 Pydantic models for request/response validation
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+from typing import List, Optional, Set
 
 
 class Message(BaseModel):
     """Individual message in a conversation"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     sender: str = Field(..., description="Message sender (user/scammer)")
     text: str = Field(..., description="Message content")
-    timestamp: int = Field(..., description="Unix timestamp")
+    timestamp: int = Field(..., ge=0, lt=2**63, description="Unix timestamp")
+
+
+class Metadata(BaseModel):
+    """Known request metadata fields; unknown fields are kept as-is"""
+    model_config = ConfigDict(frozen=True, extra='allow')
+
+    channel: Optional[str] = Field(default=None, description="Message channel (SMS, WhatsApp, ...)")
+    language: Optional[str] = Field(default=None, description="Conversation language")
+    locale: Optional[str] = Field(default=None, description="Sender locale")
 
 
 class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
     sessionId: str = Field(..., description="Unique session identifier")
     message: Message = Field(..., description="Current message")
-    conversationHistory: Optional[List[Message]] = Field(
-        default=[],
+    conversationHistory: List[Message] = Field(
+        default_factory=list,
         description="Previous messages in conversation"
     )
-    metadata: Optional[Dict] = Field(
-        default={},
+    metadata: Metadata = Field(
+        default_factory=Metadata,
         description="Additional metadata"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra='ignore',
+        json_schema_extra={
             "example": {
                 "sessionId": "session-123",
                 "message": {
@@ -36,9 +49,14 @@ class ChatRequest(BaseModel):
                     "timestamp": 1704067200
                 },
                 "conversationHistory": [],
-                "metadata": {}
+                "metadata": {
+                    "channel": "SMS",
+                    "language": "English",
+                    "locale": "IN"
+                }
             }
         }
+    )
 
 
 class ChatResponse(BaseModel):
@@ -58,8 +76,10 @@ class ChatResponse(BaseModel):
         description="Total messages in session"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra='ignore',
+        json_schema_extra={
             "example": {
                 "status": "success",
                 "reply": "I'm not sure I understand. Can you explain more?",
@@ -68,10 +88,13 @@ class ChatResponse(BaseModel):
                 "messageCount": 5
             }
         }
+    )
 
 
 class HealthResponse(BaseModel):
     """Health check response"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     status: str = Field(..., description="Service status")
     service: str = Field(..., description="Service name")
     version: str = Field(..., description="API version")
@@ -79,17 +102,29 @@ class HealthResponse(BaseModel):
 
 
 class IntelligenceData(BaseModel):
-    """Extracted intelligence data"""
-    bankAccounts: List[str] = Field(default=[], description="Extracted bank accounts")
-    upiIds: List[str] = Field(default=[], description="Extracted UPI IDs")
-    phishingLinks: List[str] = Field(default=[], description="Extracted URLs")
-    phoneNumbers: List[str] = Field(default=[], description="Extracted phone numbers")
-    suspiciousKeywords: List[str] = Field(default=[], description="Detected keywords")
-    emailAddresses: List[str] = Field(default=[], description="Extracted email addresses")
+    """Extracted intelligence data, deduplicated as sets"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    bankAccounts: Set[str] = Field(default_factory=set, description="Extracted bank accounts")
+    upiIds: Set[str] = Field(default_factory=set, description="Extracted UPI IDs")
+    phishingLinks: Set[str] = Field(default_factory=set, description="Extracted URLs")
+    phoneNumbers: Set[str] = Field(default_factory=set, description="Extracted phone numbers")
+    suspiciousKeywords: Set[str] = Field(default_factory=set, description="Detected keywords")
+    emailAddresses: Set[str] = Field(default_factory=set, description="Extracted email addresses")
+
+    @field_serializer(
+        'bankAccounts', 'upiIds', 'phishingLinks',
+        'phoneNumbers', 'suspiciousKeywords', 'emailAddresses'
+    )
+    def _sorted(self, values: Set[str]) -> List[str]:
+        """Serialize sets as sorted lists for stable output"""
+        return sorted(values)
 
 
 class SessionInfo(BaseModel):
     """Complete session information"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     sessionId: str
     messages: List[Message]
     scamDetected: bool
@@ -97,4 +132,25 @@ class SessionInfo(BaseModel):
     intel: IntelligenceData
     callbackSent: bool
     createdAt: str
-    lastUpdated: str
\ No newline at end of file
+    lastUpdated: str
+
+    @classmethod
+    def from_trusted(cls, data: dict) -> "SessionInfo":
+        """
+        Build from a session dict we stored ourselves, skipping validation
+        
+        Only use this for internal data (e.g. loaded from Redis); request
+        bodies must still go through normal validation.
+        
+        Args:
+            data: Session dictionary as saved by the API
+        
+        Returns:
+            SessionInfo instance built with model_construct
+        """
+        messages = [Message.model_construct(**m) for m in data.get("messages", [])]
+        intel = IntelligenceData.model_construct(
+            **{k: set(v) for k, v in data.get("intel", {}).items()}
+        )
+        fields = {k: v for k, v in data.items() if k not in ("messages", "intel")}
+        return cls.model_construct(messages=messages, intel=intel, **fields)
@@ -0,0 +1,120 @@
+"""
+In-process cache of agent replies for repeated scam message templates
+"""
+
+import re
+import logging
+from collections import OrderedDict
+from typing import Optional
+from config import REPLY_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Normalization patterns: scam templates mostly differ in links and numbers
+_URL_RE = re.compile(r'https?://\S+')
+_DIGITS_RE = re.compile(r'\d+')
+_PUNCT_RE = re.compile(r'[^\w#\s]+')
+_SPACE_RE = re.compile(r'\s+')
+
+# Least-recently-used order, oldest first
+_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+def normalize(text: str) -> str:
+    """
+    Reduce a message to its template form
+
+    Args:
+        text: Raw message text
+
+    Returns:
+        Lowercased text with links, numbers and punctuation masked
+    """
+    text = _URL_RE.sub(" url ", text.lower())
+    text = _DIGITS_RE.sub("#", text)
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def make_key(latest_message: str, history: list) -> str:
+    """
+    Build a cache key from the latest scammer message and our last reply
+
+    Args:
+        latest_message: The most recent message from the scammer
+        history: List of previous Message objects in the conversation
+
+    Returns:
+        Normalized cache key
+    """
+    last_reply = ""
+    for msg in reversed(history):
+        if msg.sender != 'scammer':
+            last_reply = msg.text
+            break
+    return f"{normalize(latest_message)} || {normalize(last_reply)}"
+
+
+def get_cached_reply(key: str) -> Optional[str]:
+    """
+    Look up a previously generated reply
+
+    Args:
+        key: Cache key from make_key
+
+    Returns:
+        Cached reply or None on a miss
+    """
+    reply = _cache.get(key)
+    if reply is not None:
+        _cache.move_to_end(key)
+        logger.info("♻️ Reply cache hit")
+    return reply
+
+
+def cache_reply(key: str, reply: str) -> None:
+    """
+    Store a generated reply, evicting the least recently used entries
+
+    Replies containing numbers or links are not cached: the key masks those
+    details, so such a reply could quote one scammer's account number or
+    link back to a different conversation.
+
+    Args:
+        key: Cache key from make_key
+        reply: Reply generated by Gemini
+    """
+    if REPLY_CACHE_SIZE <= 0:
+        return
+
+    if _DIGITS_RE.search(reply) or _URL_RE.search(reply):
+        return
+
+    _cache[key] = reply
+    _cache.move_to_end(key)
+    while len(_cache) > REPLY_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def test_reply_cache():
+    """Test that masked details are never replayed across conversations"""
+    first = "Your account 1234567890 is blocked, pay at https://a.example now"
+    second = "Your account 9876543210 is blocked, pay at https://b.example now"
+    key = make_key(first, [])
+    assert make_key(second, []) == key
+
+    # A reply quoting the first message's details must not reach the second
+    cache_reply(key, "Is my account 1234567890 really blocked?")
+    cache_reply(key, "Should I open https://a.example right now?")
+    assert get_cached_reply(make_key(second, [])) is None
+
+    # Generic replies are still shared between templated messages
+    cache_reply(key, "Which account do you mean? I'm confused.")
+    assert get_cached_reply(make_key(second, [])) == "Which account do you mean? I'm confused."
+    print("Reply cache test: ✅ Success")
+
+
+if __name__ == "__main__":
+    # Run test
+    logging.basicConfig(level=logging.INFO)
+    test_reply_cache()